@@ -1,28 +1,38 @@
 #!/usr/bin/env python3
 import os
+import asyncio
+import hashlib
 import subprocess
 import tempfile
 import logging
 import shutil
 import time
 import contextvars
-from uuid import uuid4
-from typing import List, Literal
+import threading
+import itertools
+from collections import OrderedDict
+from typing import List, Literal, Optional, Tuple, get_args
 # Disable ansible-lint cache explicitly in runtime
 os.environ["ANSIBLE_LINT_NO_CACHE"] = "1"
 
 from fastapi import FastAPI, HTTPException, UploadFile, File, status, Request, Response
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from pythonjsonlogger.json import JsonFormatter
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
 
 
 # ------------------------------------------------------------------------------
 # Globals
 SHOW_PROFILE_SUPPORTED = False
+ANSIBLE_LINT_PATH: Optional[str] = None
+LINT_WORK_DIR: Optional[str] = None
+LINT_ENV: Optional[dict] = None
+LINT_SEM: Optional[asyncio.Semaphore] = None
+LINT_CPUS: List[int] = []
+LINT_ARGS_BY_PROFILE: dict = {}
 
 # ------------------------------------------------------------------------------
 # Settings
@@ -32,28 +42,64 @@ class Settings(BaseSettings):
     max_upload_size_bytes: int = 5 * 1024 * 1024
     allowed_origins: List[str] = ["*"]
     log_level: str = "INFO"
+    lint_cache_size: int = 512
+    lint_work_dir_base: str = "/dev/shm"
+    ansible_cache_dir: str = "/var/cache/ansible"
+    lint_concurrency: int = os.cpu_count() or 2
+    lint_cpu_pinning: bool = False
 
     class Config:
         env_file = ".env"
 
 settings = Settings()
-SUPPORTED_PROFILES = ["basic", "production", "safety", "test", "minimal"]
+# Hot-path settings bound once instead of going through the settings model
+LINT_CMD = settings.ansible_lint_cmd
+LINT_TIMEOUT = settings.lint_timeout_seconds
+MAX_UPLOAD = settings.max_upload_size_bytes
+# Single source of truth for profiles: path validation and /v1/profiles
+Profile = Literal["basic", "production", "safety", "test", "minimal"]
+SUPPORTED_PROFILES = list(get_args(Profile))
+YAML_EXTENSIONS = frozenset({".yml", ".yaml"})
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Allowance for multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+LINT_UPLOAD_PATH_PREFIX = "/v1/lint/"
 
 # ------------------------------------------------------------------------------
 # Logging Setup
 REQUEST_ID_CTX = contextvars.ContextVar("request_id", default="-")
+# Request IDs are <start time><pid><sequence> in hex: unique across workers
+# and restarts without reading /dev/urandom on every request.
+_REQUEST_ID_PREFIX = f"{int(time.time()):08x}{os.getpid() & 0xFFFFFF:06x}"
+_REQUEST_ID_SEQ = itertools.count()
 
 class RequestIdFilter(logging.Filter):
     def filter(self, record):
         record.request_id = REQUEST_ID_CTX.get()
         return True
 
-logging.basicConfig(
-    level=getattr(logging, settings.log_level),
-    format='{"timestamp":"%(asctime)s","level":"%(levelname)s","logger":"%(name)s","request_id":"%(request_id)s","message":"%(message)s"}'
+# JsonFormatter escapes quotes/newlines in messages, which a hand-written
+# JSON format string cannot.
+LOG_LEVEL = logging.getLevelName(settings.log_level.upper())
+if not isinstance(LOG_LEVEL, int):
+    raise ValueError(f"Invalid LOG_LEVEL: {settings.log_level}")
+
+log_formatter = JsonFormatter(
+    "%(asctime)s %(levelname)s %(name)s %(request_id)s %(message)s",
+    rename_fields={"asctime": "timestamp", "levelname": "level", "name": "logger"},
 )
+# Second resolution is plenty and skips the per-record msec substitution
+log_formatter.default_msec_format = None
+log_handler = logging.StreamHandler()
+log_handler.addFilter(RequestIdFilter())
+log_handler.setFormatter(log_formatter)
+# Third-party loggers (uvicorn, ansible) share the handler through the root
+logging.basicConfig(level=LOG_LEVEL, handlers=[log_handler])
+
 logger = logging.getLogger("ansible-lint-service")
-logger.addFilter(RequestIdFilter())
+logger.setLevel(LOG_LEVEL)
+logger.addHandler(log_handler)
+logger.propagate = False
 
 # ------------------------------------------------------------------------------
 # Prometheus Metrics
@@ -61,11 +107,42 @@ REQUEST_COUNT = Counter("ansible_lint_requests_total", "Total ansible-lint reque
 REQUEST_LATENCY = Histogram("ansible_lint_request_latency_seconds", "Latency of ansible-lint requests", ["profile"])
 TIMEOUT_COUNT = Counter("ansible_lint_timeouts_total", "Number of ansible-lint timeouts")
 ERROR_COUNT = Counter("ansible_lint_errors_total", "Number of internal errors in lint runner")
+IN_FLIGHT = Gauge("ansible_lint_in_flight", "ansible-lint runs currently executing")
+CACHE_COUNT = Counter("ansible_lint_cache_lookups_total", "Lint result cache lookups", ["result"])
+
+# Concurrent scrapes within the TTL share one rendering of the registry
+METRICS_CACHE_TTL_SECONDS = 1.0
+_METRICS_CACHE = (float("-inf"), b"")
+_METRICS_LOCK = threading.Lock()
 
 # ------------------------------------------------------------------------------
 # FastAPI Setup
-app = FastAPI(title="Ansible Lint API", version="1.0.0")
+app = FastAPI(title="Ansible Lint API", version="1.0.0", default_response_class=ORJSONResponse)
+
+class RejectOversizedUploads:
+    """Refuse lint uploads whose declared size cannot fit before Starlette
+    spools the multipart body. Plain ASGI, so other routes pass straight through."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and scope["method"] == "POST"
+            and scope["path"].startswith(LINT_UPLOAD_PATH_PREFIX)
+        ):
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    if value.isdigit() and int(value) > MAX_UPLOAD + MULTIPART_OVERHEAD_BYTES:
+                        response = ORJSONResponse({"detail": "File too large"}, status_code=413)
+                        await response(scope, receive, send)
+                        return
+                    break
+        await self.app(scope, receive, send)
 
+app.add_middleware(RejectOversizedUploads)
+# Added after the size check so it wraps it and the 413 carries CORS headers
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins,
@@ -75,7 +152,7 @@ app.add_middleware(
 
 @app.middleware("http")
 async def add_request_id(request: Request, call_next):
-    rid = str(uuid4())
+    rid = f"{_REQUEST_ID_PREFIX}{next(_REQUEST_ID_SEQ):018x}"
     REQUEST_ID_CTX.set(rid)
     response = await call_next(request)
     response.headers["X-Request-ID"] = rid
@@ -83,18 +160,98 @@ async def add_request_id(request: Request, call_next):
 
 # ------------------------------------------------------------------------------
 # Feature Detection
+def resolve_ansible_lint() -> Optional[str]:
+    """Return the cached ansible-lint path, searching $PATH again only if it vanished."""
+    global ANSIBLE_LINT_PATH
+    if ANSIBLE_LINT_PATH is None or not os.path.exists(ANSIBLE_LINT_PATH):
+        ANSIBLE_LINT_PATH = shutil.which(LINT_CMD)
+    return ANSIBLE_LINT_PATH
+
 def detect_ansible_lint_features():
     global SHOW_PROFILE_SUPPORTED
     try:
-        output = subprocess.check_output([settings.ansible_lint_cmd, "--help"], text=True)
+        output = subprocess.check_output([ANSIBLE_LINT_PATH or LINT_CMD, "--help"], text=True)
         SHOW_PROFILE_SUPPORTED = "--show-profile" in output
-        logger.info(f"SHOW_PROFILE_SUPPORTED = {SHOW_PROFILE_SUPPORTED}")
+        logger.info("SHOW_PROFILE_SUPPORTED = %s", SHOW_PROFILE_SUPPORTED)
     except Exception as e:
-        logger.warning(f"ansible-lint --help failed: {e}")
+        logger.warning("ansible-lint --help failed: %s", e)
+
+# ------------------------------------------------------------------------------
+# Lint Working Directory
+def create_lint_work_dir():
+    """Create one long-lived scratch dir (tmpfs when available) for all lint runs.
+
+    ansible-lint spools stdin into a temporary file, so pointing TMPDIR here
+    keeps that churn off the journaled filesystem. Running from an empty cwd
+    also stops ansible-lint from scanning the service's own directory.
+    """
+    global LINT_WORK_DIR, LINT_ENV
+    base = settings.lint_work_dir_base
+    if not (os.path.isdir(base) and os.access(base, os.W_OK)):
+        base = None
+    LINT_WORK_DIR = tempfile.mkdtemp(prefix="ansible-lint-", dir=base)
+    LINT_ENV = {
+        **os.environ,
+        "TMPDIR": LINT_WORK_DIR,
+        "ANSIBLE_CACHE_PLUGIN": "jsonfile",
+        "ANSIBLE_CACHE_PLUGIN_CONNECTION": prepare_ansible_cache_dir(),
+        "ANSIBLE_CACHE_PLUGIN_TIMEOUT": "7200",
+    }
+    logger.info("LINT_WORK_DIR = %s", LINT_WORK_DIR)
+
+def prepare_ansible_cache_dir() -> str:
+    """Return a writable directory for Ansible's cache that outlives single runs."""
+    try:
+        os.makedirs(settings.ansible_cache_dir, exist_ok=True)
+        if os.access(settings.ansible_cache_dir, os.W_OK):
+            return settings.ansible_cache_dir
+    except OSError:
+        pass
+    fallback = os.path.join(LINT_WORK_DIR, "ansible-cache")
+    logger.warning("%s is not writable, caching under %s", settings.ansible_cache_dir, fallback)
+    os.makedirs(fallback, exist_ok=True)
+    return fallback
+
+def remove_lint_work_dir():
+    global LINT_WORK_DIR, LINT_ENV
+    if LINT_WORK_DIR:
+        shutil.rmtree(LINT_WORK_DIR, ignore_errors=True)
+    LINT_WORK_DIR, LINT_ENV = None, None
+
+# ------------------------------------------------------------------------------
+# CPU Pinning
+_cpu_round_robin = itertools.count()
+
+def detect_lint_cpus():
+    """Record the CPUs lint runs may be pinned to (Linux only, opt-in)."""
+    global LINT_CPUS
+    if settings.lint_cpu_pinning and hasattr(os, "sched_getaffinity"):
+        LINT_CPUS = sorted(os.sched_getaffinity(0))
+        logger.info("Pinning ansible-lint runs across CPUs %s", LINT_CPUS)
+
+def pin_to_next_cpu(pid: int):
+    # Only called from the event loop, so the round-robin counter needs no lock
+    cpu = LINT_CPUS[next(_cpu_round_robin) % len(LINT_CPUS)]
+    try:
+        os.sched_setaffinity(pid, {cpu})
+    except OSError as e:
+        # The child may already have exited
+        logger.debug("Could not pin pid %d to CPU %d: %s", pid, cpu, e)
 
 @app.on_event("startup")
 def on_startup():
+    global LINT_SEM
+    # Created here so the semaphore binds to the server's event loop
+    LINT_SEM = asyncio.Semaphore(max(1, settings.lint_concurrency))
+    create_lint_work_dir()
+    detect_lint_cpus()
+    logger.info("ANSIBLE_LINT_PATH = %s", resolve_ansible_lint())
     detect_ansible_lint_features()
+    LINT_ARGS_BY_PROFILE.update({p: tuple(build_lint_args(p)) for p in SUPPORTED_PROFILES})
+
+@app.on_event("shutdown")
+def on_shutdown():
+    remove_lint_work_dir()
 
 # ------------------------------------------------------------------------------
 # Models
@@ -109,62 +266,157 @@ class ProfilesResponse(BaseModel):
 class HealthResponse(BaseModel):
     status: str
 
+# ------------------------------------------------------------------------------
+# Result Cache
+# Only completed runs are cached: 0 = clean, 2 = violations found.
+CACHEABLE_EXIT_CODES = frozenset({0, 2})
+
+class LintResultCache:
+    """Bounded LRU of lint results keyed by (content digest, profile)."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[tuple, LintResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[LintResult]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+
+    def put(self, key: tuple, result: LintResult) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+LINT_CACHE = LintResultCache(settings.lint_cache_size)
+
+def content_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
 # ------------------------------------------------------------------------------
 # Core Lint Logic
-async def run_ansible_lint(playbook: str, profile: str) -> LintResult:
-    def _invoke() -> LintResult:
-        tmpdir = tempfile.mkdtemp()
-        path = os.path.join(tmpdir, "playbook.yml")
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(playbook)
-
-        cmd = [settings.ansible_lint_cmd, f"--profile={profile}", "--nocolor"]
-        if SHOW_PROFILE_SUPPORTED:
-            cmd.append("--show-profile")
-        cmd.append(path)
-
-        logger.info(f"Running command: {' '.join(cmd)}")
-        start = time.time()
-        exit_code, stdout, stderr = 1, "", ""
-
-        try:
-            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=settings.lint_timeout_seconds)
-            exit_code = proc.returncode
-            stdout = proc.stdout
-            stderr = proc.stderr
-        except subprocess.TimeoutExpired:
-            TIMEOUT_COUNT.inc()
-            stderr = f"ansible-lint timed out after {settings.lint_timeout_seconds}s"
-        except Exception as e:
-            ERROR_COUNT.inc()
-            stderr = f"ansible-lint failed: {e}"
-        finally:
-            REQUEST_LATENCY.labels(profile=profile).observe(time.time() - start)
-            REQUEST_COUNT.labels(profile=profile, exit_code=str(exit_code)).inc()
-            shutil.rmtree(tmpdir, ignore_errors=True)
-
-        return LintResult(exit_code=exit_code, stdout=stdout, stderr=stderr)
-
-    return await run_in_threadpool(_invoke)
+def build_lint_args(profile: str) -> List[str]:
+    # --offline stops ansible-lint from installing collections/roles per run
+    args = [f"--profile={profile}", "--nocolor", "--offline"]
+    if SHOW_PROFILE_SUPPORTED:
+        args.append("--show-profile")
+    return args
+
+async def _lint_with_subprocess(playbook: bytes, profile: str) -> Tuple[int, bytes, bytes]:
+    # "-" makes ansible-lint read the playbook from stdin
+    cmd = [ANSIBLE_LINT_PATH or LINT_CMD, *LINT_ARGS_BY_PROFILE[profile], "-"]
+    logger.info("Running command: %s", cmd)
+
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=LINT_WORK_DIR,
+        env=LINT_ENV,
+    )
+    if LINT_CPUS:
+        pin_to_next_cpu(proc.pid)
+    try:
+        out, err = await asyncio.wait_for(
+            proc.communicate(input=playbook),
+            timeout=LINT_TIMEOUT,
+        )
+    except BaseException:
+        # Timeouts and cancellation (client disconnects, shutdown) alike: reap
+        # the child before the caller gives its LINT_SEM slot back.
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    return proc.returncode, out, err
+
+async def run_ansible_lint(playbook: bytes, profile: str) -> LintResult:
+    start = time.time()
+    key = (content_digest(playbook), profile)
+    cached = LINT_CACHE.get(key)
+    if cached is not None:
+        # Hits still count as requests, so the totals match what clients saw
+        CACHE_COUNT.labels(result="hit").inc()
+        REQUEST_LATENCY.labels(profile=profile).observe(time.time() - start)
+        REQUEST_COUNT.labels(profile=profile, exit_code=str(cached.exit_code)).inc()
+        return cached
+    CACHE_COUNT.labels(result="miss").inc()
+
+    exit_code, stdout, stderr = 1, "", ""
+
+    try:
+        async with LINT_SEM:
+            with IN_FLIGHT.track_inprogress():
+                exit_code, raw_stdout, raw_stderr = await _lint_with_subprocess(playbook, profile)
+        # Decode once at the response boundary; stray non-UTF-8 bytes in the
+        # output must not turn a finished lint into a runner error.
+        stdout = raw_stdout.decode("utf-8", "replace")
+        stderr = raw_stderr.decode("utf-8", "replace")
+    except asyncio.TimeoutError:
+        TIMEOUT_COUNT.inc()
+        stderr = f"ansible-lint timed out after {LINT_TIMEOUT}s"
+    except Exception as e:
+        ERROR_COUNT.inc()
+        stderr = f"ansible-lint failed: {e}"
+    finally:
+        REQUEST_LATENCY.labels(profile=profile).observe(time.time() - start)
+        REQUEST_COUNT.labels(profile=profile, exit_code=str(exit_code)).inc()
+
+    result = LintResult(exit_code=exit_code, stdout=stdout, stderr=stderr)
+    if result.exit_code in CACHEABLE_EXIT_CODES:
+        LINT_CACHE.put(key, result)
+    return result
+
+# ------------------------------------------------------------------------------
+# Upload Handling
+async def read_upload(file: UploadFile, limit: int) -> bytes:
+    if file.size is not None and file.size > limit:
+        raise HTTPException(status_code=413, detail="File too large")
+    chunks, total = [], 0
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > limit:
+            raise HTTPException(status_code=413, detail="File too large")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def ensure_utf8(content: bytes):
+    # Validate without keeping a decoded copy; ASCII needs no decode at all
+    if content.isascii():
+        return
+    try:
+        content.decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Playbook must be UTF-8 encoded")
 
 # ------------------------------------------------------------------------------
 # Endpoints
 @app.post("/v1/lint/{profile}", response_model=LintResult)
-async def lint_playbook(profile: Literal["basic", "production", "safety", "test", "minimal"], file: UploadFile = File(...)):
-    if not file.filename.lower().endswith((".yml", ".yaml")):
+async def lint_playbook(profile: Profile, file: UploadFile = File(...)):
+    if os.path.splitext(file.filename or "")[1].lower() not in YAML_EXTENSIONS:
         raise HTTPException(status_code=400, detail="Only .yml/.yaml files are accepted")
-    content = await file.read()
-    if len(content) > settings.max_upload_size_bytes:
-        raise HTTPException(status_code=413, detail="File too large")
-    return await run_ansible_lint(content.decode("utf-8"), profile)
+    content = await read_upload(file, MAX_UPLOAD)
+    ensure_utf8(content)
+    return await run_ansible_lint(content, profile)
 
 @app.get("/v1/lint/test", response_model=LintResult)
-async def test_lint_playbook(profile: Literal["basic", "production", "safety", "test", "minimal"] = "basic"):
+async def test_lint_playbook(profile: Profile = "basic"):
     path = os.getenv("CI_TEST_PLAYBOOK_PATH", "tests/hello.yml")
     
     # Check if the test playbook file exists
     if not os.path.exists(path):
-        logger.error(f"Test playbook not found at path: {path}")
+        logger.error("Test playbook not found at path: %s", path)
         raise HTTPException(status_code=404, detail=f"Test playbook not found at {path}")
     
     # Validate profile parameter
@@ -172,25 +424,45 @@ async def test_lint_playbook(profile: Literal["basic", "production", "safety", "
         raise HTTPException(status_code=400, detail=f"Invalid profile '{profile}'. Supported profiles: {SUPPORTED_PROFILES}")
     
     try:
-        with open(path, "r", encoding="utf-8") as f:
+        with open(path, "rb") as f:
             content = f.read()
-        logger.info(f"Running test lint with profile: {profile}")
+        logger.info("Running test lint with profile: %s", profile)
         return await run_ansible_lint(content, profile)
     except Exception as e:
-        logger.error(f"Error reading test playbook: {e}")
+        logger.error("Error reading test playbook: %s", e)
         raise HTTPException(status_code=500, detail=f"Error reading test playbook: {str(e)}")
 
-@app.get("/v1/profiles", response_model=ProfilesResponse)
-def list_profiles():
-    return ProfilesResponse(profiles=SUPPORTED_PROFILES)
+# Fixed payloads are serialized once; handlers only wrap the bytes
+PROFILES_BODY = ProfilesResponse(profiles=SUPPORTED_PROFILES).model_dump_json().encode()
+HEALTH_BODY = HealthResponse(status="ok").model_dump_json().encode()
+
+@app.get("/v1/profiles", responses={200: {"model": ProfilesResponse}})
+async def list_profiles():
+    return Response(PROFILES_BODY, media_type="application/json")
+
+@app.get("/v1/health", responses={200: {"model": HealthResponse}})
+async def health():
+    return Response(HEALTH_BODY, media_type="application/json")
 
-@app.get("/v1/health", response_model=HealthResponse)
-def health():
-    return HealthResponse(status="ok")
+@app.get("/v1/ready", response_model=HealthResponse)
+def readiness():
+    if not resolve_ansible_lint():
+        raise HTTPException(status_code=503, detail=f"{LINT_CMD} not found on PATH")
+    return HealthResponse(status="ready")
 
 @app.get("/metrics")
 def metrics():
-    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    global _METRICS_CACHE
+    rendered_at, body = _METRICS_CACHE
+    if time.monotonic() - rendered_at > METRICS_CACHE_TTL_SECONDS:
+        with _METRICS_LOCK:
+            # Another scrape may have refreshed it while we waited
+            rendered_at, body = _METRICS_CACHE
+            now = time.monotonic()
+            if now - rendered_at > METRICS_CACHE_TTL_SECONDS:
+                body = generate_latest()
+                _METRICS_CACHE = (now, body)
+    return Response(body, media_type=CONTENT_TYPE_LATEST)
 
 # ------------------------------------------------------------------------------
 # Entrypoint
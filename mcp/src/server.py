@@ -1,34 +1,52 @@
 import sys
 import os
 import json
+import re
 import time
 import logging
 import asyncio
-from typing import Dict, Any, Optional
-from contextlib import asynccontextmanager
-import tempfile
-from pathlib import Path
+import hashlib
+from collections import OrderedDict
+import functools
+from typing import Dict, Any, Optional, Callable, Awaitable
 
 import httpx
+import orjson
 import yaml
 
+# libyaml's C parser when available; the pure-Python one otherwise
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
 from starlette.applications import Starlette
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 from starlette.routing import Route, Mount
+from starlette.middleware import Middleware
 from starlette.middleware.cors import CORSMiddleware
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.server.fastmcp.tools import Tool
 from mcp.server.sse import SseServerTransport
 
 # ─────────────── Config & Globals ───────────────
 ANSIBLE_LINT_API = "http://localhost:8080/v1"
 SUPPORTED_PROFILES = ["basic", "production", "safety", "test", "minimal"]
+PROFILE_SET = frozenset(SUPPORTED_PROFILES)
+LINT_URL_BY_PROFILE = {p: f"{ANSIBLE_LINT_API}/lint/{p}" for p in SUPPORTED_PROFILES}
 MAX_CONCURRENT_REQUESTS = 10
 REQUEST_TIMEOUT = 60.0
 MAX_PLAYBOOK_SIZE = 1024 * 1024  # 1MB limit
-
-sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+MAX_RESPONSE_SIZE = 8 * MAX_PLAYBOOK_SIZE  # cap on buffered lint API replies
+STREAM_CHUNK_SIZE = 65536
+# Explicit origins let CORSMiddleware skip its wildcard-with-credentials branch
+ALLOWED_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:8090,http://127.0.0.1:8090").split(",")
+    if origin.strip()
+]
 
 # Configure structured logging
 logging.basicConfig(
@@ -38,61 +56,193 @@ logging.basicConfig(
 logger = logging.getLogger("ansible-lint-mcp")
 
 # Connection pool for HTTP client
-http_client: Optional[httpx.AsyncClient] = None
-semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+_http_client: Optional[httpx.AsyncClient] = None
+
+# ─────────────── Admission Control ───────────────
+admission = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
 
 # ─────────────── HTTP Client Management ───────────────
-@asynccontextmanager
-async def get_http_client():
-    global http_client
-    if http_client is None:
-        http_client = httpx.AsyncClient(
-            timeout=httpx.Timeout(REQUEST_TIMEOUT),
-            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
-        )
-    try:
-        yield http_client
-    except Exception as e:
-        logger.error(f"HTTP client error: {e}")
-        raise
+def open_http_client():
+    global _http_client
+    # Pool sized so admitted requests plus health probes never wait on a connection
+    pool_size = MAX_CONCURRENT_REQUESTS + 2
+    _http_client = httpx.AsyncClient(
+        timeout=httpx.Timeout(REQUEST_TIMEOUT),
+        limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    )
+
+def http_client() -> httpx.AsyncClient:
+    if _http_client is None:
+        raise RuntimeError("HTTP client is not open; the server has not started")
+    return _http_client
+
+async def post_lint_request(
+    url: str,
+    data: bytes,
+    on_progress: Optional[Callable[[int], Awaitable[None]]] = None,
+) -> Dict[str, Any]:
+    """Upload a playbook to the lint API and parse the JSON reply from raw bytes
+
+    on_progress, if given, is awaited with the body bytes received so far as
+    each chunk arrives from upstream.
+    """
+    # An explicit content type skips httpx's mimetype guess on every upload
+    files = {"file": ("playbook.yml", data, "application/x-yaml")}
+    async with http_client().stream("POST", url, files=files) as resp:
+        if resp.is_error:
+            # Error handlers report the body, so it must be read first
+            await resp.aread()
+            resp.raise_for_status()
+        body = bytearray()
+        async for chunk in resp.aiter_bytes(STREAM_CHUNK_SIZE):
+            body += chunk
+            if len(body) > MAX_RESPONSE_SIZE:
+                raise ValueError(f"Lint API response exceeds {MAX_RESPONSE_SIZE} bytes")
+            if on_progress is not None:
+                await on_progress(len(body))
+    return orjson.loads(body)
 
 async def close_http_client():
-    global http_client
-    if http_client:
-        await http_client.aclose()
-        http_client = None
+    global _http_client
+    if _http_client:
+        await _http_client.aclose()
+        _http_client = None
 
 # ─────────────── Helpers ───────────────
-def wrap_tool_output(tool_name: str, payload: Any, success: bool = True) -> str:
-    return json.dumps({
+class BoundedCache:
+    """Small LRU mapping used to memoize results for repeated playbooks.
+
+    Entries are evicted once there are more than maxsize of them or, when
+    max_bytes is set, once the sizes given to put() add up to more than it.
+    """
+
+    def __init__(self, maxsize: int, max_bytes: Optional[int] = None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, size: int = 0):
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.total_bytes -= old[1]
+        self._entries[key] = (value, size)
+        self.total_bytes += size
+        while len(self._entries) > self.maxsize or (
+            self.max_bytes is not None and self.total_bytes > self.max_bytes
+        ):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+
+# IDEs and LLM loops re-submit the same playbook many times
+validation_cache = BoundedCache(256)
+# Formatted results carry the raw lint output, which can be up to
+# MAX_RESPONSE_SIZE per entry, so that cache is also bounded by bytes held
+FORMAT_CACHE_MAX_BYTES = 4 * MAX_RESPONSE_SIZE
+format_cache = BoundedCache(128, max_bytes=FORMAT_CACHE_MAX_BYTES)
+
+def content_digest(*parts: bytes) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part)
+    return h.digest()
+
+# Responses only carry second resolution, so format each second once
+_timestamp_cache = {"sec": -1, "text": ""}
+
+def utc_timestamp() -> str:
+    now = int(time.time())
+    if now != _timestamp_cache["sec"]:
+        _timestamp_cache["sec"] = now
+        _timestamp_cache["text"] = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(now))
+    return _timestamp_cache["text"]
+
+def tool_output(tool_name: str, payload: Any, success: bool = True) -> Dict[str, Any]:
+    return {
         "tool": tool_name,
         "success": success,
         "output": payload,
-        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
-    }, indent=2)
+        "timestamp": utc_timestamp()
+    }
+
+def _err(tool_name: str, message: str) -> Dict[str, Any]:
+    return tool_output(tool_name, {"error": message}, success=False)
 
-def validate_playbook_content(playbook: str) -> tuple[bool, str]:
-    """Validate playbook content and size"""
-    if len(playbook.encode('utf-8')) > MAX_PLAYBOOK_SIZE:
+_TIMEOUT_MSG = f"Lint request timed out after {REQUEST_TIMEOUT}s"
+
+def _format_err(e: Exception) -> str:
+    """Describe an upstream lint failure for a tool error envelope"""
+    if isinstance(e, httpx.TimeoutException):
+        return _TIMEOUT_MSG
+    if isinstance(e, httpx.HTTPStatusError):
+        return f"Lint API returned {e.response.status_code}: {e.response.text}"
+    return f"Unexpected error during linting: {str(e)}"
+
+def validate_playbook(data: bytes, digest: Optional[bytes] = None) -> tuple[bool, str]:
+    """Validate UTF-8 encoded playbook content and size"""
+    if len(data) > MAX_PLAYBOOK_SIZE:
         return False, f"Playbook exceeds maximum size of {MAX_PLAYBOOK_SIZE} bytes"
     
+    key = digest or content_digest(data)
+    cached = validation_cache.get(key)
+    if cached is None:
+        cached = _parse_yaml(data)
+        validation_cache.put(key, cached)
+    return cached
+
+def _parse_yaml(data: bytes) -> tuple[bool, str]:
     try:
-        # Basic YAML validation
-        yaml.safe_load(playbook)
+        # Well-formedness only: walk the parser's event stream without
+        # composing nodes or constructing Python objects.
+        for _ in yaml.parse(data, Loader=YamlLoader):
+            pass
         return True, ""
     except yaml.YAMLError as e:
         return False, f"Invalid YAML format: {str(e)}"
 
 def sanitize_profile(profile: str) -> str:
     """Sanitize and validate profile parameter"""
+    if profile in PROFILE_SET:
+        return profile
     profile = profile.strip().lower()
-    if profile not in SUPPORTED_PROFILES:
+    if profile not in PROFILE_SET:
         logger.warning(f"Invalid profile '{profile}', using 'basic'")
         return "basic"
     return profile
 
+# Issue headers ("WARNING ..."/"ERROR ...", possibly indented) and the
+# indented detail lines that follow them; pattern may need adjustment for
+# other ansible-lint versions.
+LINT_LINE_RE = re.compile(
+    r"^[ \t]*((WARNING|ERROR).*?)[ \t\r]*$|^[ \t]+(\S.*?)[ \t\r]*$",
+    re.MULTILINE,
+)
+
 def format_lint_output(result: Dict[str, Any]) -> Dict[str, Any]:
-    """Format lint output for LLM consumption"""
+    """Format lint output for LLM consumption, reusing earlier results for identical output"""
+    stdout = result.get("stdout", "").encode('utf-8')
+    stderr = result.get("stderr", "").encode('utf-8')
+    key = (
+        result.get("profile", "unknown"),
+        result.get("exit_code", -1),
+        content_digest(stdout, b"\0", stderr),
+    )
+    formatted = format_cache.get(key)
+    if formatted is None:
+        formatted = _format_lint_output(result)
+        format_cache.put(key, formatted, size=len(stdout) + len(stderr))
+    return formatted
+
+def _format_lint_output(result: Dict[str, Any]) -> Dict[str, Any]:
     formatted = {
         "summary": {
             "exit_code": result.get("exit_code", -1),
@@ -110,211 +260,237 @@ def format_lint_output(result: Dict[str, Any]) -> Dict[str, Any]:
     stdout = result.get("stdout", "")
     if stdout:
         # Try to extract structured information from ansible-lint output
-        lines = stdout.split('\n')
         issues = []
         current_issue = None
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Look for issue patterns (this may need adjustment based on your ansible-lint version)
-            if line.startswith('WARNING') or line.startswith('ERROR'):
-                if current_issue:
-                    issues.append(current_issue)
+        for match in LINT_LINE_RE.finditer(stdout):
+            message, severity, detail = match.groups()
+            if message is not None:
                 current_issue = {
-                    "severity": "warning" if line.startswith('WARNING') else "error",
-                    "message": line,
+                    "severity": "warning" if severity == "WARNING" else "error",
+                    "message": message,
                     "details": []
                 }
-            elif current_issue and line.startswith(' '):
-                current_issue["details"].append(line.strip())
-        
-        if current_issue:
-            issues.append(current_issue)
+                issues.append(current_issue)
+            elif current_issue is not None:
+                current_issue["details"].append(detail)
         
+        error_count = sum(1 for i in issues if i["severity"] == "error")
         formatted["issues"] = issues
         formatted["summary"]["issue_count"] = len(issues)
-        formatted["summary"]["error_count"] = len([i for i in issues if i["severity"] == "error"])
-        formatted["summary"]["warning_count"] = len([i for i in issues if i["severity"] == "warning"])
+        formatted["summary"]["error_count"] = error_count
+        formatted["summary"]["warning_count"] = len(issues) - error_count
     
     return formatted
 
 # ─────────────── MCP Server & Tools ───────────────
+# Static tool payload, built once at import
+PROFILES_OUTPUT = {
+    "profiles": SUPPORTED_PROFILES,
+    "profile_descriptions": {
+        "basic": "Basic rule set for general use",
+        "production": "Strict rules for production environments",
+        "safety": "Conservative rules that avoid false positives",
+        "test": "Rules optimized for test playbooks",
+        "minimal": "Minimal rule set for quick checks"
+    },
+    "default_profile": "basic"
+}
+
 mcp = FastMCP("Ansible Lint MCP Server", dependencies=["httpx", "pyyaml"])
 sse = SseServerTransport("/messages/")
 
-@mcp.tool(name="lint_ansible_playbook", description="Run ansible-lint and return structured report suitable for LLM analysis")
-async def lint_ansible_playbook(playbook: str, profile: str = "basic") -> str:
+# Tool implementations return envelope dicts; filled in by register_tool
+TOOL_FUNCTIONS: Dict[str, Callable[..., Awaitable[Dict[str, Any]]]] = {}
+
+def register_tool(name: str, description: str, context_kwarg: Optional[str] = None):
+    """Expose a dict-returning tool over MCP (as a JSON string) and /api/v1/tool (as a dict).
+
+    context_kwarg names the parameter FastMCP fills with its Context. It is
+    never accepted from /api/v1/tool callers, where the tool runs without one.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def mcp_entry(*args, **kwargs) -> str:
+            # Compact orjson output: indentation only doubled the bytes sent
+            return orjson.dumps(await func(*args, **kwargs)).decode('utf-8')
+
+        # Named explicitly because FastMCP only detects a bare Context
+        # annotation, not Optional[Context]
+        mcp._tool_manager._tools[name] = Tool.from_function(
+            mcp_entry, name=name, description=description, context_kwarg=context_kwarg
+        )
+
+        if context_kwarg is None:
+            TOOL_FUNCTIONS[name] = func
+        else:
+            @functools.wraps(func)
+            async def api_entry(**kwargs):
+                if context_kwarg in kwargs:
+                    raise TypeError(f"{name}() got an unexpected keyword argument '{context_kwarg}'")
+                return await func(**kwargs)
+
+            TOOL_FUNCTIONS[name] = api_entry
+        return func
+    return decorator
+
+@register_tool(name="lint_ansible_playbook", description="Run ansible-lint and return structured report suitable for LLM analysis")
+async def lint_ansible_playbook(playbook: str, profile: str = "basic") -> Dict[str, Any]:
     """Lint an Ansible playbook and return a structured report"""
     
     # Validate inputs
-    is_valid, error_msg = validate_playbook_content(playbook)
+    data = playbook.encode('utf-8')
+    is_valid, error_msg = validate_playbook(data)
     if not is_valid:
-        return wrap_tool_output("lint_ansible_playbook", {"error": error_msg}, success=False)
+        return _err("lint_ansible_playbook", error_msg)
     
     profile = sanitize_profile(profile)
-    url = f"{ANSIBLE_LINT_API}/lint/{profile}"
+    url = LINT_URL_BY_PROFILE[profile]
     
-    async with semaphore:  # Rate limiting
+    async with admission:  # Rate limiting
         try:
-            async with get_http_client() as client:
-                files = {"file": ("playbook.yml", playbook.encode('utf-8'))}
-                
-                logger.info(f"Starting lint request with profile: {profile}")
-                resp = await client.post(url, files=files)
-                resp.raise_for_status()
-                result = resp.json()
-                
-                # Add profile info to result
-                result["profile"] = profile
-                
-                # Format output for LLM consumption
-                formatted_result = format_lint_output(result)
-                
-                logger.info(f"Lint completed successfully, exit_code: {result.get('exit_code', 'unknown')}")
-                return wrap_tool_output("lint_ansible_playbook", formatted_result)
-                
-        except httpx.TimeoutException:
-            error_msg = f"Lint request timed out after {REQUEST_TIMEOUT}s"
-            logger.error(error_msg)
-            return wrap_tool_output("lint_ansible_playbook", {"error": error_msg}, success=False)
-        except httpx.HTTPStatusError as e:
-            error_msg = f"Lint API returned {e.response.status_code}: {e.response.text}"
-            logger.error(error_msg)
-            return wrap_tool_output("lint_ansible_playbook", {"error": error_msg}, success=False)
+            logger.info(f"Starting lint request with profile: {profile}")
+            result = await post_lint_request(url, data)
+            
+            # Add profile info to result
+            result["profile"] = profile
+            
+            # Format output for LLM consumption
+            formatted_result = format_lint_output(result)
+            
+            logger.info(f"Lint completed successfully, exit_code: {result.get('exit_code', 'unknown')}")
+            return tool_output("lint_ansible_playbook", formatted_result)
+            
         except Exception as e:
-            error_msg = f"Unexpected error during linting: {str(e)}"
+            error_msg = _format_err(e)
             logger.error(error_msg)
-            return wrap_tool_output("lint_ansible_playbook", {"error": error_msg}, success=False)
+            return _err("lint_ansible_playbook", error_msg)
 
-@mcp.tool(name="get_lint_profiles", description="Get supported ansible-lint profiles and their descriptions")
-async def get_lint_profiles() -> str:
+@register_tool(name="get_lint_profiles", description="Get supported ansible-lint profiles and their descriptions")
+async def get_lint_profiles() -> Dict[str, Any]:
     """Get available lint profiles"""
-    profiles_info = {
-        "basic": "Basic rule set for general use",
-        "production": "Strict rules for production environments", 
-        "safe": "Conservative rules that avoid false positives",
-        "test": "Rules optimized for test playbooks",
-        "minimal": "Minimal rule set for quick checks"
-    }
-    
-    result = {
-        "profiles": SUPPORTED_PROFILES,
-        "profile_descriptions": profiles_info,
-        "default_profile": "basic"
-    }
-    
-    return wrap_tool_output("get_lint_profiles", result)
+    return tool_output("get_lint_profiles", PROFILES_OUTPUT)
 
-@mcp.tool(name="validate_playbook_syntax", description="Validate Ansible playbook YAML syntax without full linting")
-async def validate_playbook_syntax(playbook: str) -> str:
+@register_tool(name="validate_playbook_syntax", description="Validate Ansible playbook YAML syntax without full linting")
+async def validate_playbook_syntax(playbook: str) -> Dict[str, Any]:
     """Quick syntax validation for playbooks"""
-    is_valid, error_msg = validate_playbook_content(playbook)
+    data = playbook.encode('utf-8')
+    is_valid, error_msg = validate_playbook(data)
     
     result = {
         "valid": is_valid,
         "error": error_msg if not is_valid else None,
-        "size_bytes": len(playbook.encode('utf-8')),
+        "size_bytes": len(data),
         "max_size_bytes": MAX_PLAYBOOK_SIZE
     }
     
-    return wrap_tool_output("validate_playbook_syntax", result, success=is_valid)
+    return tool_output("validate_playbook_syntax", result, success=is_valid)
 
-@mcp.tool(name="lint_playbook_stream", description="Run lint with progress updates (for long-running operations)")
-async def lint_playbook_stream(playbook: str, profile: str = "basic") -> str:
-    """Lint with streaming progress updates"""
-    job_id = f"lint-job-{int(time.time())}-{hash(playbook) & 0x7fffffff}"
+@register_tool(
+    name="lint_playbook_stream",
+    description="Run lint with progress updates (for long-running operations)",
+    context_kwarg="ctx",
+)
+async def lint_playbook_stream(playbook: str, profile: str = "basic", ctx: Optional[Context] = None) -> Dict[str, Any]:
+    """Lint with streaming progress updates
+
+    Over MCP, FastMCP passes ctx and progress goes to the client as log and
+    progress notifications; /api/v1/tool calls run without ctx.
+    """
+    data = playbook.encode('utf-8')
+    # Stable across processes (unlike hash()), and doubles as the validation cache key
+    digest = content_digest(data)
+    job_id = f"lint-job-{int(time.time())}-{digest[:8].hex()}"
     
     # Validate inputs first
-    is_valid, error_msg = validate_playbook_content(playbook)
+    is_valid, error_msg = validate_playbook(data, digest)
     if not is_valid:
-        sse.send_message({
-            "event": "lint-status",
-            "data": {"job_id": job_id, "status": "ERROR", "error": error_msg}
-        })
-        return wrap_tool_output("lint_playbook_stream", {"error": error_msg}, success=False)
+        if ctx is not None:
+            await ctx.error(f"{job_id} ERROR: {error_msg}")
+        return _err("lint_playbook_stream", error_msg)
     
     profile = sanitize_profile(profile)
     
-    sse.send_message({
-        "event": "lint-status", 
-        "data": {"job_id": job_id, "status": "STARTED", "profile": profile}
-    })
+    report_progress = None
+    if ctx is not None:
+        await ctx.info(f"{job_id} STARTED: profile {profile}")
 
-    async with semaphore:
-        try:
-            # Simulate progress steps
-            for i in range(1, 4):
-                await asyncio.sleep(0.5)  # Non-blocking sleep
-                sse.send_message({
-                    "event": "lint-status",
-                    "data": {"job_id": job_id, "status": f"Processing step {i}/3"}
-                })
-
-            url = f"{ANSIBLE_LINT_API}/lint/{profile}"
-            async with get_http_client() as client:
-                files = {"file": ("playbook.yml", playbook.encode('utf-8'))}
-                resp = await client.post(url, files=files)
-                resp.raise_for_status()
-                result = resp.json()
-                result["profile"] = profile
+        async def report_progress(received: int):
+            # The lint API replies with one JSON document once ansible-lint
+            # finishes, so bytes received is the only meaningful progress
+            await ctx.report_progress(received)
 
-            formatted_result = format_lint_output(result)
-            
-            sse.send_message({
-                "event": "lint-status",
-                "data": {"job_id": job_id, "status": "COMPLETED", "result": formatted_result}
-            })
+    try:
+        url = LINT_URL_BY_PROFILE[profile]
+        # Hold an admission slot for the upstream call, including its stream
+        async with admission:
+            result = await post_lint_request(url, data, on_progress=report_progress)
+        result["profile"] = profile
 
-            return wrap_tool_output("lint_playbook_stream", {
-                "job_id": job_id,
-                **formatted_result
-            })
+        formatted_result = format_lint_output(result)
+        
+        if ctx is not None:
+            await ctx.info(f"{job_id} COMPLETED: exit code {result.get('exit_code', 'unknown')}")
 
-        except Exception as e:
-            error_msg = str(e)
-            logger.error(f"Streaming lint error: {error_msg}")
-            sse.send_message({
-                "event": "lint-status",
-                "data": {"job_id": job_id, "status": "ERROR", "error": error_msg}
-            })
-            return wrap_tool_output("lint_playbook_stream", {"error": error_msg}, success=False)
-
-# Store tool functions for manual access
-TOOL_FUNCTIONS = {
-    "lint_ansible_playbook": lint_ansible_playbook,
-    "get_lint_profiles": get_lint_profiles,
-    "validate_playbook_syntax": validate_playbook_syntax,
-    "lint_playbook_stream": lint_playbook_stream,
-}
+        return tool_output("lint_playbook_stream", {
+            "job_id": job_id,
+            **formatted_result
+        })
+
+    except Exception as e:
+        error_msg = _format_err(e)
+        logger.error(f"Streaming lint error: {error_msg}")
+        if ctx is not None:
+            await ctx.error(f"{job_id} ERROR: {error_msg}")
+        return _err("lint_playbook_stream", error_msg)
 
 # ─────────────── API Routes ───────────────
+# Every field is fixed once the tools above are registered
+ROOT_BODY = orjson.dumps({
+    "status": "ok",
+    "service": "Ansible Lint MCP Server",
+    "available_tools": list(TOOL_FUNCTIONS.keys()),
+    "max_concurrent_requests": MAX_CONCURRENT_REQUESTS,
+    "request_timeout": REQUEST_TIMEOUT
+})
+
 async def api_root(request: Request):
-    return JSONResponse({
-        "status": "ok",
-        "service": "Ansible Lint MCP Server",
-        "available_tools": list(TOOL_FUNCTIONS.keys()),
-        "max_concurrent_requests": MAX_CONCURRENT_REQUESTS,
-        "request_timeout": REQUEST_TIMEOUT
-    })
+    return Response(ROOT_BODY, media_type="application/json")
+
+# Probes from every replica would otherwise each hit the lint API
+HEALTH_CACHE_TTL = 2.0
+HEALTH_PROBE_TIMEOUT = 1.0
+_health_cache = {"ts": float("-inf"), "ok": False}
+# One probe at a time: checks arriving mid-probe wait for its result
+_health_lock = asyncio.Lock()
+
+async def lint_api_healthy() -> bool:
+    """Upstream health, re-probed at most once per HEALTH_CACHE_TTL seconds"""
+    if time.monotonic() - _health_cache["ts"] < HEALTH_CACHE_TTL:
+        return _health_cache["ok"]
+    async with _health_lock:
+        # Another check may have refreshed it while we waited
+        if time.monotonic() - _health_cache["ts"] < HEALTH_CACHE_TTL:
+            return _health_cache["ok"]
+        try:
+            resp = await asyncio.wait_for(
+                http_client().get(f"{ANSIBLE_LINT_API}/health"),
+                timeout=HEALTH_PROBE_TIMEOUT
+            )
+            ok = resp.status_code == 200
+        except Exception:
+            ok = False
+        _health_cache["ts"], _health_cache["ok"] = time.monotonic(), ok
+        return ok
 
 async def health_check(request: Request):
     """Health check endpoint"""
-    try:
-        # Test connection to ansible-lint API
-        async with get_http_client() as client:
-            resp = await client.get(f"{ANSIBLE_LINT_API}/health", timeout=5.0)
-            api_healthy = resp.status_code == 200
-    except:
-        api_healthy = False
+    api_healthy = await lint_api_healthy()
     
     status = "healthy" if api_healthy else "degraded" 
     return JSONResponse({
         "status": status,
         "ansible_lint_api": api_healthy,
-        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+        "timestamp": utc_timestamp()
     }, status_code=200 if api_healthy else 503)
 
 async def tool_route(request: Request):
@@ -335,7 +511,7 @@ async def tool_route(request: Request):
         # Call the tool function directly
         logger.info(f"Executing tool: {tool_name}")
         result = await TOOL_FUNCTIONS[tool_name](**inputs)
-        return JSONResponse(json.loads(result))
+        return Response(orjson.dumps(result), media_type="application/json")
         
     except json.JSONDecodeError:
         return JSONResponse({"error": "Invalid JSON in request body"}, status_code=400)
@@ -355,6 +531,7 @@ async def handle_sse(request: Request):
 # ─────────────── Application Lifecycle ───────────────
 async def startup():
     logger.info("Starting Ansible Lint MCP Server...")
+    open_http_client()
 
 async def shutdown():
     logger.info("Shutting down Ansible Lint MCP Server...")
@@ -371,25 +548,29 @@ app = Starlette(
         Route("/api/v1/tool", tool_route, methods=["POST"]),
         Mount("/messages/", app=sse.handle_post_message),
     ],
+    # Declared up front so the pure-ASGI stack is built with the app
+    middleware=[
+        Middleware(
+            CORSMiddleware,
+            allow_origins=ALLOWED_ORIGINS,
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        ),
+    ],
     on_startup=[startup],
     on_shutdown=[shutdown]
 )
 
-# Add CORS middleware for cross-origin requests
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
         app, 
         host="0.0.0.0", 
         port=8090,
+        # C event loop and HTTP parser; uvloop is unavailable on Windows
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+        http="httptools",
         log_level="info",
-        access_log=True
+        access_log=False
     )
\ No newline at end of file
@@ -5,381 +5,339 @@ Tests all endpoints, error conditions, and production scenarios
 """
 
 import asyncio
-import json
 import time
 import sys
 import logging
-from typing import Dict, Any, List
+import logging.handlers
+import queue
+from typing import Dict, Any, List, Optional, Callable, NamedTuple, Tuple
 from dataclasses import dataclass
 from contextlib import asynccontextmanager
 
 import httpx
-import yaml
+import orjson
 
-# Configure logging
+# Configure logging: records are queued, and a listener thread writes them
+# to stderr so results arriving together don't block the event loop on I/O
+_log_queue = queue.SimpleQueue()
+_console = logging.StreamHandler()
+_console.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+log_listener = logging.handlers.QueueListener(_log_queue, _console)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    # The listener's handler adds the timestamp and level
+    format='%(message)s',
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
 logger = logging.getLogger("mcp_test")
 
-@dataclass
+_PASS = "✅ PASS"
+_FAIL = "❌ FAIL"
+
+VALID_PLAYBOOK = """---
+- hosts: localhost
+  tasks:
+    - name: Test task
+      debug:
+        msg: "Hello World"
+"""
+
+INVALID_PLAYBOOK = """---
+- hosts: localhost
+  tasks:
+    - name: Test task
+      debug:
+        msg: "Hello World
+        # Missing closing quote
+"""
+
+LINT_PLAYBOOK = """---
+- hosts: localhost
+  gather_facts: no
+  tasks:
+    - name: Test task
+      debug:
+        msg: "Hello World"
+    
+    - name: Another task
+      shell: echo "test"
+      changed_when: false
+"""
+
+MINIMAL_PLAYBOOK = "---\n- hosts: localhost\n  tasks: []"
+
+# A playbook larger than the server's 1MB limit, spliced straight into the
+# request bytes so the 1MB filler never exists as a str
+_OVERSIZED_BODY = (
+    b'{"tool_name":"validate_playbook_syntax","inputs":{"playbook":"---\\n# '
+    + b"x" * (1024 * 1024 + 100)
+    + b'"}}'
+)
+
+def _dig(data: Any, *keys: str, default: Any = None) -> Any:
+    """Follow keys into a nested response, or return default if any is missing"""
+    try:
+        for key in keys:
+            data = data[key]
+    except (KeyError, TypeError):
+        return default
+    return data
+
+class _Check(NamedTuple):
+    statuses: Tuple[int, ...]  # Acceptable HTTP status codes
+    passes: Callable[[Any], bool]  # Predicate on the parsed JSON body
+    error: str  # Reported when the predicate fails
+
+def _accept(data: Any) -> bool:
+    return True
+
+# Pass/fail rules for the request/response tests, keyed by test name
+_CHECKS = {
+    # 503 is acceptable if ansible-lint API is down
+    "Health Check": _Check((200, 503), _accept, ""),
+    "API Root": _Check((200,), lambda d: "available_tools" in d, "Missing available_tools"),
+    "Get Lint Profiles": _Check(
+        (200,),
+        lambda d: d.get("success") and _dig(d, "output", "profiles") is not None,
+        "Invalid response structure",
+    ),
+    "Validate Valid Playbook": _Check(
+        (200,),
+        lambda d: d.get("success") and _dig(d, "output", "valid"),
+        "Should be valid",
+    ),
+    "Validate Invalid Playbook": _Check(
+        (200,),
+        lambda d: not d.get("success") and not _dig(d, "output", "valid"),
+        "Should be invalid",
+    ),
+    # Any structured response (success or failure) counts
+    "Lint Ansible Playbook": _Check(
+        (200,),
+        lambda d: "output" in d and "tool" in d,
+        "Invalid response structure",
+    ),
+    "Oversized Playbook Rejection": _Check(
+        (200,),
+        lambda d: not d.get("success") and "exceeds maximum size" in _dig(d, "output", "error", default=""),
+        "Should reject large playbook",
+    ),
+    "Invalid Tool Name": _Check(
+        (404,),
+        lambda d: "not found" in d.get("error", "").lower(),
+        "Wrong error message",
+    ),
+    # The request should succeed (profile gets sanitized to "basic")
+    "Profile Validation": _Check((200,), _accept, ""),
+}
+
+# slots=True needs Python 3.10+; older interpreters get a plain dataclass
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_SLOTS)
 class TestResult:
     name: str
     passed: bool
     duration: float
     error: str = ""
-    response: Dict[str, Any] = None
+    response: Optional[Dict[str, Any]] = None
+
+def write_report(path: str, summary: Dict[str, Any], results: List[TestResult]):
+    """Write summary plus a "results" list as indented JSON, one result at a time
+
+    Only one encoded result is held in memory at once, rather than the whole
+    report, which embeds every response.
+    """
+    with open(path, "wb") as f:
+        # Reopen the encoded summary by dropping its closing "\n}"
+        f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2)[:-2])
+        f.write(b',\n  "results": [')
+        for i, result in enumerate(results):
+            f.write(b"\n    " if i == 0 else b",\n    ")
+            # Strings escape their newlines, so raw ones are only indentation
+            f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2).replace(b"\n", b"\n    "))
+        f.write(b"\n  ]\n}" if results else b"]\n}")
+
+class _Timer:
+    __slots__ = ("start", "end", "error")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.error: Optional[Exception] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
 
 class MCPTester:
-    def __init__(self, base_url: str = "http://localhost:8090"):
+    def __init__(self, base_url: str = "http://localhost:8090", concurrency: int = 64):
         self.base_url = base_url
+        self.concurrency = concurrency
         self.client = None
         self.results: List[TestResult] = []
+        # Request bodies never change between runs, so encode them once
+        self._payloads = {
+            name: orjson.dumps({"tool_name": tool, "inputs": inputs})
+            for name, tool, inputs in (
+                ("get_lint_profiles", "get_lint_profiles", {}),
+                ("validate_valid", "validate_playbook_syntax", {"playbook": VALID_PLAYBOOK}),
+                ("validate_invalid", "validate_playbook_syntax", {"playbook": INVALID_PLAYBOOK}),
+                ("lint", "lint_ansible_playbook", {"playbook": LINT_PLAYBOOK, "profile": "basic"}),
+                ("invalid_tool", "nonexistent_tool", {}),
+                # Unknown profiles should fall back to "basic"
+                ("invalid_profile", "lint_ansible_playbook",
+                 {"playbook": MINIMAL_PLAYBOOK, "profile": "invalid_profile"}),
+            )
+        }
         
     async def __aenter__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # Every test hits the same host, so keep enough warm connections for the
+        # concurrent test and let base_url resolve the relative paths below;
+        # every tool call sends JSON, so its Content-Type is a client default
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Content-Type": "application/json"},
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_keepalive_connections=32,
+                max_connections=64,
+                keepalive_expiry=60.0,
+            ),
+        )
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.client:
             await self.client.aclose()
 
+    @asynccontextmanager
+    async def _timed(self):
+        """Time a test body; an exception ends the block and is kept on the timer"""
+        timer = _Timer()
+        try:
+            yield timer
+        except Exception as e:
+            timer.error = e
+        finally:
+            timer.end = time.perf_counter()
+
+    async def _run_one(self, name: str, path: str = "/api/v1/tool", body: Optional[bytes] = None) -> TestResult:
+        """GET path, or POST body to it, and judge the reply with _CHECKS[name]"""
+        check = _CHECKS[name]
+        async with self._timed() as t:
+            if body is None:
+                resp = await self.client.get(path)
+            else:
+                resp = await self.client.post(path, content=body)
+            
+            if resp.status_code not in check.statuses:
+                expected = " or ".join(map(str, check.statuses))
+                return TestResult(name, False, t.elapsed, f"Expected {expected}, got {resp.status_code}")
+            data = orjson.loads(resp.content)
+            if check.passes(data):
+                return TestResult(name, True, t.elapsed, response=data)
+            return TestResult(name, False, t.elapsed, check.error)
+                
+        return TestResult(name, False, t.elapsed, str(t.error))
+
     def log_result(self, result: TestResult):
         self.results.append(result)
-        status = "✅ PASS" if result.passed else "❌ FAIL"
-        logger.info(f"{status} {result.name} ({result.duration:.2f}s)")
+        status = _PASS if result.passed else _FAIL
+        logger.info("%s %s (%.2fs)", status, result.name, result.duration)
         if not result.passed:
-            logger.error(f"   Error: {result.error}")
+            logger.error("   Error: %s", result.error)
 
     async def test_health_check(self) -> TestResult:
         """Test health endpoint"""
-        start_time = time.time()
-        try:
-            resp = await self.client.get(f"{self.base_url}/health")
-            duration = time.time() - start_time
-            
-            if resp.status_code in [200, 503]:  # 503 is acceptable if ansible-lint API is down
-                data = resp.json()
-                return TestResult("Health Check", True, duration, response=data)
-            else:
-                return TestResult("Health Check", False, duration, f"Status: {resp.status_code}")
-                
-        except Exception as e:
-            duration = time.time() - start_time
-            return TestResult("Health Check", False, duration, str(e))
+        return await self._run_one("Health Check", "/health")
 
     async def test_api_root(self) -> TestResult:
         """Test API root endpoint"""
-        start_time = time.time()
-        try:
-            resp = await self.client.get(f"{self.base_url}/api/v1/")
-            duration = time.time() - start_time
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                if "available_tools" in data:
-                    return TestResult("API Root", True, duration, response=data)
-                else:
-                    return TestResult("API Root", False, duration, "Missing available_tools")
-            else:
-                return TestResult("API Root", False, duration, f"Status: {resp.status_code}")
-                
-        except Exception as e:
-            duration = time.time() - start_time
-            return TestResult("API Root", False, duration, str(e))
+        return await self._run_one("API Root", "/api/v1/")
 
     async def test_get_lint_profiles(self) -> TestResult:
         """Test get_lint_profiles tool"""
-        start_time = time.time()
-        try:
-            payload = {
-                "tool_name": "get_lint_profiles",
-                "inputs": {}
-            }
-            resp = await self.client.post(
-                f"{self.base_url}/api/v1/tool",
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
-            duration = time.time() - start_time
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                if data.get("success") and "profiles" in data.get("output", {}):
-                    return TestResult("Get Lint Profiles", True, duration, response=data)
-                else:
-                    return TestResult("Get Lint Profiles", False, duration, "Invalid response structure")
-            else:
-                return TestResult("Get Lint Profiles", False, duration, f"Status: {resp.status_code}")
-                
-        except Exception as e:
-            duration = time.time() - start_time
-            return TestResult("Get Lint Profiles", False, duration, str(e))
+        return await self._run_one("Get Lint Profiles", body=self._payloads["get_lint_profiles"])
 
     async def test_validate_playbook_syntax_valid(self) -> TestResult:
         """Test validate_playbook_syntax with valid YAML"""
-        start_time = time.time()
-        valid_playbook = """---
-- hosts: localhost
-  tasks:
-    - name: Test task
-      debug:
-        msg: "Hello World"
-"""
-        try:
-            payload = {
-                "tool_name": "validate_playbook_syntax",
-                "inputs": {"playbook": valid_playbook}
-            }
-            resp = await self.client.post(
-                f"{self.base_url}/api/v1/tool",
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
-            duration = time.time() - start_time
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                if data.get("success") and data.get("output", {}).get("valid"):
-                    return TestResult("Validate Valid Playbook", True, duration, response=data)
-                else:
-                    return TestResult("Validate Valid Playbook", False, duration, "Should be valid")
-            else:
-                return TestResult("Validate Valid Playbook", False, duration, f"Status: {resp.status_code}")
-                
-        except Exception as e:
-            duration = time.time() - start_time
-            return TestResult("Validate Valid Playbook", False, duration, str(e))
+        return await self._run_one("Validate Valid Playbook", body=self._payloads["validate_valid"])
 
     async def test_validate_playbook_syntax_invalid(self) -> TestResult:
         """Test validate_playbook_syntax with invalid YAML"""
-        start_time = time.time()
-        invalid_playbook = """---
-- hosts: localhost
-  tasks:
-    - name: Test task
-      debug:
-        msg: "Hello World
-        # Missing closing quote
-"""
-        try:
-            payload = {
-                "tool_name": "validate_playbook_syntax",
-                "inputs": {"playbook": invalid_playbook}
-            }
-            resp = await self.client.post(
-                f"{self.base_url}/api/v1/tool",
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
-            duration = time.time() - start_time
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                if not data.get("success") and not data.get("output", {}).get("valid"):
-                    return TestResult("Validate Invalid Playbook", True, duration, response=data)
-                else:
-                    return TestResult("Validate Invalid Playbook", False, duration, "Should be invalid")
-            else:
-                return TestResult("Validate Invalid Playbook", False, duration, f"Status: {resp.status_code}")
-                
-        except Exception as e:
-            duration = time.time() - start_time
-            return TestResult("Validate Invalid Playbook", False, duration, str(e))
+        return await self._run_one("Validate Invalid Playbook", body=self._payloads["validate_invalid"])
 
     async def test_lint_ansible_playbook(self) -> TestResult:
         """Test lint_ansible_playbook tool - Note: This may fail if ansible-lint API is not running"""
-        start_time = time.time()
-        test_playbook = """---
-- hosts: localhost
-  gather_facts: no
-  tasks:
-    - name: Test task
-      debug:
-        msg: "Hello World"
-    
-    - name: Another task
-      shell: echo "test"
-      changed_when: false
-"""
-        try:
-            payload = {
-                "tool_name": "lint_ansible_playbook",
-                "inputs": {
-                    "playbook": test_playbook,
-                    "profile": "basic"
-                }
-            }
-            resp = await self.client.post(
-                f"{self.base_url}/api/v1/tool",
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
-            duration = time.time() - start_time
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                # Check if we got a structured response (success or failure)
-                if "output" in data and "tool" in data:
-                    return TestResult("Lint Ansible Playbook", True, duration, response=data)
-                else:
-                    return TestResult("Lint Ansible Playbook", False, duration, "Invalid response structure")
-            else:
-                return TestResult("Lint Ansible Playbook", False, duration, f"Status: {resp.status_code}")
-                
-        except Exception as e:
-            duration = time.time() - start_time
-            return TestResult("Lint Ansible Playbook", False, duration, str(e))
+        return await self._run_one("Lint Ansible Playbook", body=self._payloads["lint"])
 
     async def test_oversized_playbook(self) -> TestResult:
         """Test with oversized playbook (should be rejected)"""
-        start_time = time.time()
-        # Create a playbook larger than 1MB
-        large_playbook = "---\n" + "# " + "x" * (1024 * 1024 + 100)
-        
-        try:
-            payload = {
-                "tool_name": "validate_playbook_syntax",
-                "inputs": {"playbook": large_playbook}
-            }
-            resp = await self.client.post(
-                f"{self.base_url}/api/v1/tool",
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
-            duration = time.time() - start_time
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                if not data.get("success") and "exceeds maximum size" in data.get("output", {}).get("error", ""):
-                    return TestResult("Oversized Playbook Rejection", True, duration, response=data)
-                else:
-                    return TestResult("Oversized Playbook Rejection", False, duration, "Should reject large playbook")
-            else:
-                return TestResult("Oversized Playbook Rejection", False, duration, f"Status: {resp.status_code}")
-                
-        except Exception as e:
-            duration = time.time() - start_time
-            return TestResult("Oversized Playbook Rejection", False, duration, str(e))
+        return await self._run_one("Oversized Playbook Rejection", body=_OVERSIZED_BODY)
 
     async def test_invalid_tool_name(self) -> TestResult:
         """Test with invalid tool name"""
-        start_time = time.time()
-        try:
-            payload = {
-                "tool_name": "nonexistent_tool",
-                "inputs": {}
-            }
-            resp = await self.client.post(
-                f"{self.base_url}/api/v1/tool",
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
-            duration = time.time() - start_time
-            
-            if resp.status_code == 404:
-                data = resp.json()
-                if "not found" in data.get("error", "").lower():
-                    return TestResult("Invalid Tool Name", True, duration, response=data)
-                else:
-                    return TestResult("Invalid Tool Name", False, duration, "Wrong error message")
-            else:
-                return TestResult("Invalid Tool Name", False, duration, f"Expected 404, got {resp.status_code}")
-                
-        except Exception as e:
-            duration = time.time() - start_time
-            return TestResult("Invalid Tool Name", False, duration, str(e))
+        return await self._run_one("Invalid Tool Name", body=self._payloads["invalid_tool"])
 
     async def test_invalid_json(self) -> TestResult:
         """Test with invalid JSON payload"""
-        start_time = time.time()
-        try:
-            resp = await self.client.post(
-                f"{self.base_url}/api/v1/tool",
-                content="invalid json content",
+        async with self._timed() as t:
+            # Only the status matters, so the error body is never read
+            async with self.client.stream(
+                "POST",
+                "/api/v1/tool",
+                content=b"invalid json content",
                 headers={"Content-Type": "application/json"}
-            )
-            duration = time.time() - start_time
+            ) as resp:
+                status_code = resp.status_code
             
-            if resp.status_code == 400:
-                return TestResult("Invalid JSON", True, duration)
+            if status_code == 400:
+                return TestResult("Invalid JSON", True, t.elapsed)
             else:
-                return TestResult("Invalid JSON", False, duration, f"Expected 400, got {resp.status_code}")
+                return TestResult("Invalid JSON", False, t.elapsed, f"Expected 400, got {status_code}")
                 
-        except Exception as e:
-            duration = time.time() - start_time
-            return TestResult("Invalid JSON", False, duration, str(e))
+        return TestResult("Invalid JSON", False, t.elapsed, str(t.error))
 
     async def test_concurrent_requests(self) -> TestResult:
         """Test concurrent request handling"""
-        start_time = time.time()
+        total = self.concurrency
+        payload = self._payloads["get_lint_profiles"]
+        ok = bytearray(total)  # 1 per request that returned 200
         
         async def make_request(i: int):
-            payload = {
-                "tool_name": "get_lint_profiles", 
-                "inputs": {}
-            }
-            resp = await self.client.post(
-                f"{self.base_url}/api/v1/tool",
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
-            return resp.status_code == 200
+            try:
+                resp = await self.client.post("/api/v1/tool", content=payload)
+            except httpx.HTTPError:
+                return  # Counted as a failure; must not cancel the rest of the group
+            ok[i] = resp.status_code == 200
         
-        try:
-            # Make 5 concurrent requests
-            tasks = [make_request(i) for i in range(5)]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            duration = time.time() - start_time
+        async with self._timed() as t:
+            if hasattr(asyncio, "TaskGroup"):  # Python 3.11+
+                async with asyncio.TaskGroup() as tg:
+                    for i in range(total):
+                        tg.create_task(make_request(i))
+            else:
+                await asyncio.gather(*(make_request(i) for i in range(total)))
             
-            success_count = sum(1 for r in results if r is True)
-            if success_count >= 4:  # Allow for some failures
-                return TestResult("Concurrent Requests", True, duration, 
-                                response={"successful": success_count, "total": 5})
+            success_count = ok.count(1)
+            if success_count >= total * 0.8:  # Allow for some failures
+                return TestResult("Concurrent Requests", True, t.elapsed, 
+                                response={"successful": success_count, "total": total})
             else:
-                return TestResult("Concurrent Requests", False, duration, 
-                                f"Only {success_count}/5 requests succeeded")
+                return TestResult("Concurrent Requests", False, t.elapsed, 
+                                f"Only {success_count}/{total} requests succeeded")
                 
-        except Exception as e:
-            duration = time.time() - start_time
-            return TestResult("Concurrent Requests", False, duration, str(e))
+        return TestResult("Concurrent Requests", False, t.elapsed, str(t.error))
 
     async def test_profile_validation(self) -> TestResult:
         """Test profile parameter validation"""
-        start_time = time.time()
-        test_playbook = "---\n- hosts: localhost\n  tasks: []"
-        
-        try:
-            payload = {
-                "tool_name": "lint_ansible_playbook",
-                "inputs": {
-                    "playbook": test_playbook,
-                    "profile": "invalid_profile"  # Should default to "basic"
-                }
-            }
-            resp = await self.client.post(
-                f"{self.base_url}/api/v1/tool",
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
-            duration = time.time() - start_time
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                # The request should succeed (profile gets sanitized to "basic")
-                return TestResult("Profile Validation", True, duration, response=data)
-            else:
-                return TestResult("Profile Validation", False, duration, f"Status: {resp.status_code}")
-                
-        except Exception as e:
-            duration = time.time() - start_time
-            return TestResult("Profile Validation", False, duration, str(e))
+        return await self._run_one("Profile Validation", body=self._payloads["invalid_profile"])
 
     async def run_all_tests(self):
         """Run all tests and generate report"""
         logger.info("🚀 Starting MCP Server Test Suite")
-        logger.info(f"Testing server at: {self.base_url}")
+        logger.info("Testing server at: %s", self.base_url)
         
         tests = [
             self.test_health_check,
@@ -390,25 +348,27 @@ class MCPTester:
             self.test_oversized_playbook,
             self.test_invalid_tool_name,
             self.test_invalid_json,
-            self.test_concurrent_requests,
             self.test_profile_validation,
-            self.test_lint_ansible_playbook,  # Run last as it may fail if ansible-lint API is down
         ]
+        # Alone, so its own fan-out is not competing with the other tests for
+        # admission slots and connections
+        concurrency_tests = [self.test_concurrent_requests]
+        # Run last, on its own, as it may fail if ansible-lint API is down
+        final_tests = [self.test_lint_ansible_playbook]
         
-        for test_func in tests:
-            try:
-                result = await test_func()
+        for batch in (tests, concurrency_tests, final_tests):
+            # The tests are independent, so each batch costs one round trip
+            results = await asyncio.gather(*(t() for t in batch), return_exceptions=True)
+            for test_func, result in zip(batch, results):
+                if isinstance(result, BaseException):
+                    result = TestResult(test_func.__name__, False, 0, str(result))
                 self.log_result(result)
-            except Exception as e:
-                error_result = TestResult(test_func.__name__, False, 0, str(e))
-                self.log_result(error_result)
-            
-            # Small delay between tests
-            await asyncio.sleep(0.1)
         
-        self.generate_report()
+        # Every request is done, so close the client while the report is written
+        client, self.client = self.client, None
+        await asyncio.gather(self.generate_report(), client.aclose())
 
-    def generate_report(self):
+    async def generate_report(self):
         """Generate test report"""
         total_tests = len(self.results)
         passed_tests = sum(1 for r in self.results if r.passed)
@@ -417,46 +377,35 @@ class MCPTester:
         logger.info("\n" + "="*60)
         logger.info("📊 TEST REPORT")
         logger.info("="*60)
-        logger.info(f"Total Tests: {total_tests}")
-        logger.info(f"Passed: {passed_tests}")
-        logger.info(f"Failed: {failed_tests}")
-        logger.info(f"Success Rate: {(passed_tests/total_tests)*100:.1f}%")
+        logger.info("Total Tests: %d", total_tests)
+        logger.info("Passed: %d", passed_tests)
+        logger.info("Failed: %d", failed_tests)
+        logger.info("Success Rate: %.1f%%", (passed_tests/total_tests)*100)
         logger.info("="*60)
         
         if failed_tests > 0:
             logger.info("\n❌ FAILED TESTS:")
             for result in self.results:
                 if not result.passed:
-                    logger.info(f"  - {result.name}: {result.error}")
+                    logger.info("  - %s: %s", result.name, result.error)
         
         logger.info("\n📋 DETAILED RESULTS:")
         for result in self.results:
             status = "✅" if result.passed else "❌"
-            logger.info(f"  {status} {result.name} ({result.duration:.2f}s)")
+            logger.info("  %s %s (%.2fs)", status, result.name, result.duration)
         
         # Save detailed report to file
-        report_data = {
+        summary = {
             "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
             "total_tests": total_tests,
             "passed": passed_tests,
             "failed": failed_tests,
             "success_rate": (passed_tests/total_tests)*100,
-            "results": [
-                {
-                    "name": r.name,
-                    "passed": r.passed,
-                    "duration": r.duration,
-                    "error": r.error,
-                    "response": r.response
-                }
-                for r in self.results
-            ]
         }
+        # Encoding and writing every response is blocking file I/O
+        await asyncio.to_thread(write_report, "mcp_test_report.json", summary, self.results)
         
-        with open("mcp_test_report.json", "w") as f:
-            json.dump(report_data, f, indent=2)
-        
-        logger.info(f"\n📄 Detailed report saved to: mcp_test_report.json")
+        logger.info("\n📄 Detailed report saved to: %s", "mcp_test_report.json")
 
 async def main():
     """Main test runner"""
@@ -465,6 +414,8 @@ async def main():
     parser = argparse.ArgumentParser(description="Test Ansible Lint MCP Server")
     parser.add_argument("--url", default="http://localhost:8090", 
                        help="Base URL of the MCP server")
+    parser.add_argument("--concurrency", type=int, default=64,
+                       help="Number of simultaneous requests in the concurrency test")
     parser.add_argument("--verbose", "-v", action="store_true",
                        help="Enable verbose logging")
     
@@ -473,12 +424,22 @@ async def main():
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
     
-    async with MCPTester(args.url) as tester:
-        await tester.run_all_tests()
+    log_listener.start()
+    try:
+        async with MCPTester(args.url, args.concurrency) as tester:
+            await tester.run_all_tests()
+    finally:
+        # Flush queued records before exiting
+        log_listener.stop()
     
     # Exit with error code if any tests failed
     failed_count = sum(1 for r in tester.results if not r.passed)
     sys.exit(1 if failed_count > 0 else 0)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        import uvloop
+    except ImportError:  # Optional, and not available on Windows
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
\ No newline at end of file